@@ -50,6 +50,14 @@ from gridai.create_dataset import create_dataset
     show_default=True,
     help="Maximum number of transformers to include in the graph.",
 )
+@click.option(
+    "-w",
+    "--max-workers",
+    default=1,
+    type=click.IntRange(min=0),
+    show_default=True,
+    help="Number of processes for building graphs, use 0 for all CPUs.",
+)
 def generate_dataset(
     json_file,
     sqlite_file,
@@ -57,6 +65,7 @@ def generate_dataset(
     is_secondary,
     min_transformers,
     max_transformers,
+    max_workers,
 ):
     """Command line function to generate geojsons from opendss model"""
 
@@ -67,6 +76,7 @@ def generate_dataset(
         dist_xmfr_graphs=bool(is_secondary),
         min_num_transformers=int(min_transformers),
         max_num_transformers=int(max_transformers),
+        max_workers=int(max_workers) or None,
     )
 
 
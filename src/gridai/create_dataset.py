@@ -1,7 +1,11 @@
 """This module implements a class for loading
 training graphs from smartds datasets."""
 
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+import os
 from pathlib import Path
+from typing import Iterable, Iterator
 
 import networkx as nx
 from torch_geometric.data import Data, SQLiteDatabase
@@ -22,42 +26,89 @@ def get_data_object(graph: nx.Graph):
     """Function to create pytorch data object from networkx graph."""
 
     # Building node feature matrix
-    node_attrs = []
+    node_attrs = [None] * graph.number_of_nodes()
     node_index_mapper = {}
 
-    for id_, (node, node_data) in enumerate(graph.nodes(data=True)):
-        node_attr: interfaces.DistNodeAttrs = node_data["attr"]
-        node_attrs.append(node_attr.to_array())
+    node_attr: interfaces.DistNodeAttrs
+    for id_, (node, node_attr) in enumerate(graph.nodes(data="attr")):
+        node_attrs[id_] = node_attr.to_array()
         node_index_mapper[node] = id_
 
-    # Edge list
-    edges = list(graph.edges())
-    source_nodes, target_nodes = zip(*edges)
+    # Build edge list and edge attribute matrix in a single pass
+    num_edges = graph.number_of_edges()
+    source_indexes, target_indexes = [0] * num_edges, [0] * num_edges
+    edge_attrs = [None] * num_edges
 
-    edge_list = torch.tensor(
-        [
-            [node_index_mapper[item] for item in source_nodes],
-            [node_index_mapper[item] for item in target_nodes],
-        ],
-        dtype=torch.long,
-    )
+    edge_attr: interfaces.DistEdgeAttrs
+    for id_, (source_node, target_node, edge_attr) in enumerate(graph.edges(data="attr")):
+        source_indexes[id_] = node_index_mapper[source_node]
+        target_indexes[id_] = node_index_mapper[target_node]
+        edge_attrs[id_] = edge_attr.to_array()
 
-    # Build edge attribute matrix
-    edge_attrs = []
-
-    for _, _, edge_data in graph.edges(data=True):
-        edge_attr: interfaces.DistEdgeAttrs = edge_data["attr"]
-        edge_attrs.append(edge_attr.to_array())
+    edge_list = torch.tensor([source_indexes, target_indexes], dtype=torch.long)
 
     return Data(x=node_attrs, edge_index=edge_list, edge_attr=edge_attrs)
 
 
+def _iter_json_files(folder_path: str | Path) -> Iterator[Path]:
+    """Internal generator to find json files recursively in a folder."""
+    sub_folders = []
+    try:
+        entries = os.scandir(folder_path)
+    except PermissionError:
+        # Skip unreadable folders the same way Path.glob does.
+        return
+    with entries:
+        for entry in entries:
+            if entry.is_dir(follow_symlinks=False):
+                sub_folders.append(entry.path)
+            elif entry.name.lower().endswith(".json") and entry.is_file():
+                yield Path(entry.path)
+    for sub_folder in sub_folders:
+        yield from _iter_json_files(sub_folder)
+
+
 @timeit
 def _read_system_json(file_path: Path) -> DistributionSystem:
     """Internal method to read system json file."""
     return DistributionSystem.from_json(file_path)
 
 
+def _get_data_objects(
+    json_file: Path,
+    dist_xmfr_graphs: bool,
+    min_num_transformers: int | None,
+    max_num_transformers: int | None,
+) -> list[Data]:
+    """Internal method to build data objects from a system json file."""
+    graph = get_networkx_model(_read_system_json(json_file), check_cycles=False)
+    if dist_xmfr_graphs:
+        networks = get_transformer_sub_graphs(graph)
+    else:
+        networks = get_node_graphs(
+            graph,
+            lt=min_num_transformers,
+            gt=max_num_transformers,
+        )
+    if networks is None:
+        raise GraphNotFoundError("No networks found.")
+    for network_ in networks:
+        if not nx.is_forest(network_):
+            msg = f"Sub graph extracted from {json_file} has loops."
+            raise ValueError(msg)
+    return [get_data_object(network_) for network_ in networks]
+
+
+def _insert_data_objects(db: SQLiteDatabase, data_lists: Iterable[list[Data]]) -> None:
+    """Internal method to insert data objects into the database in order."""
+    counter = 0
+    for data_list in data_lists:
+        if not data_list:
+            continue
+        db.multi_insert(range(counter, counter + len(data_list)), data_list)
+        counter += len(data_list)
+
+
 @timeit
 def create_dataset(
     json_file_path: Path,
@@ -66,6 +117,7 @@ def create_dataset(
     dist_xmfr_graphs: bool = True,
     min_num_transformers: int | None = None,
     max_num_transformers: int | None = None,
+    max_workers: int | None = 1,
 ) -> None:
     """Function to create a dataset. Explores all master.dss file recursively
     in the specified folder path and creates a sqlite database.
@@ -88,35 +140,39 @@ def create_dataset(
     max_num_transformers: int
         Maximum number of transformers to include
         in the dataset.
+    max_workers: int
+        Number of processes used to build graphs from
+        system JSON files. Use None for all available CPUs.
+
+    Raises
+    ------
+
+    ValueError
+        If max_workers is less than 1.
     """
 
+    if max_workers is not None and max_workers < 1:
+        msg = f"{max_workers=} must be at least 1 or None."
+        raise ValueError(msg)
+
     db = SQLiteDatabase(path=sqlite_file, name=table_name)
     try:
-        counter = 0
         json_files = (
             [json_file_path]
             if not json_file_path.is_dir()
-            else [
-                item
-                for item in json_file_path.glob("**/*")
-                if item.is_file() and item.suffix.lower() == ".json"
-            ]
+            else list(_iter_json_files(json_file_path))
+        )
+        build_data_objects = partial(
+            _get_data_objects,
+            dist_xmfr_graphs=dist_xmfr_graphs,
+            min_num_transformers=min_num_transformers,
+            max_num_transformers=max_num_transformers,
         )
-        for json_file in json_files:
-            sys = _read_system_json(json_file)
-            networks = get_transformer_sub_graphs(get_networkx_model(sys))
-            if dist_xmfr_graphs:
-                networks = get_transformer_sub_graphs(get_networkx_model(sys))
-            else:
-                networks = get_node_graphs(
-                    get_networkx_model(sys),
-                    lt=min_num_transformers,
-                    gt=max_num_transformers,
-                )
-            if networks is None:
-                raise GraphNotFoundError("No networks found.")
-            for network_ in networks:
-                db[counter] = get_data_object(network_)
-                counter += 1
+        if max_workers != 1 and len(json_files) > 1:
+            # Only the main process writes to the database.
+            with ProcessPoolExecutor(max_workers=max_workers) as pool:
+                _insert_data_objects(db, pool.map(build_data_objects, json_files))
+        else:
+            _insert_data_objects(db, map(build_data_objects, json_files))
     finally:
         db.close()
@@ -1,9 +1,11 @@
 """This module contains an opendss parser utility functions."""
 
-from collections import defaultdict
+from collections import defaultdict, deque
+from itertools import chain
+from functools import cache
 import logging
-import copy
-from typing import NamedTuple, Any, Type
+import math
+from typing import Callable, NamedTuple, Any, Type
 
 import networkx as nx
 from gdm import (
@@ -20,7 +22,9 @@ from gdm import (
     DistributionVoltageSource,
     MatrixImpedanceSwitch,
     MatrixImpedanceFuse,
+    Phase,
 )
+from gdm.quantities import ureg
 from infrasys.component import Component
 
 from gridai.interfaces import (
@@ -35,58 +39,90 @@ from gridai.util import timeit
 
 logger = logging.getLogger(__name__)
 
+KW = ureg.kilowatt
+KVAR = ureg.kilovar
+KV = ureg.kilovolt
+KVA = ureg.kilova
+MI = ureg.mile
+AMP = ureg.ampere
+SQRT3 = math.sqrt(3)
+
+_PHASE_ALIAS = {
+    "BA": PhaseType.AB,
+    "CB": PhaseType.BC,
+    "AC": PhaseType.CA,
+    "S2S1": PhaseType.S1S2,
+}
+PHASE_LOOKUP: dict[str, PhaseType] = {**PhaseType.__members__, **_PHASE_ALIAS}
+
 
 @timeit
-def add_transformer_edges(system: DistributionSystem, graph: nx.Graph) -> nx.Graph:
-    """Function to add transformer edges in the graph."""
+def get_transformer_edges(system: DistributionSystem) -> list[tuple[str, str, dict]]:
+    """Function to get transformer edges for the graph."""
 
     trs: list[DistributionTransformer] = list(system.get_components(DistributionTransformer))
+    edges = []
     for tr in trs:
-        edge_attrs = DistEdgeAttrs(
-            num_phase=tr.equipment.windings[0].num_phases,
-            capacity_kva=tr.equipment.windings[0].rated_power.to("kilova").magnitude,
+        winding = tr.equipment.windings[0]
+        edge_attrs = DistEdgeAttrs.model_construct(
+            capacity_kva=float(winding.rated_power.m_as(KVA)),
             edge_type=DistEdgeType.TRANSFORMER,
-            length_miles=0,
+            length_miles=0.0,
         )
-        graph.add_edge(tr.buses[0].name, tr.buses[1].name, attr=edge_attrs)
+        edges.append((tr.buses[0].name, tr.buses[1].name, {"attr": edge_attrs}))
+    return edges
+
+
+def _get_equipment_ampacity(branch: Any) -> float:
+    """Internal method to get ampacity from branch equipment."""
+    return branch.equipment.ampacity.m_as(AMP)
+
+
+def _get_conductor_ampacity(branch: Any) -> float:
+    """Internal method to get maximum ampacity from branch conductors."""
+    return max(c.ampacity for c in branch.equipment.conductors).m_as(AMP)
 
-    return graph
 
+_AMPACITY_HANDLERS: dict[type, Callable[[Any], float]] = {
+    MatrixImpedanceBranch: _get_equipment_ampacity,
+    SequenceImpedanceBranch: _get_equipment_ampacity,
+    MatrixImpedanceSwitch: _get_equipment_ampacity,
+    MatrixImpedanceFuse: _get_equipment_ampacity,
+    GeometryBranch: _get_conductor_ampacity,
+}
 
-def _get_ampacity_from_branch(branch: Any):
+
+def _get_ampacity_from_branch(branch: Any) -> float:
     """Internal method to get ampacity from branch."""
-    if (
-        isinstance(branch, MatrixImpedanceBranch)
-        or isinstance(branch, SequenceImpedanceBranch)
-        or isinstance(branch, MatrixImpedanceSwitch)
-        or isinstance(branch, MatrixImpedanceFuse)
-    ):
-        return branch.equipment.ampacity.to("ampere").magnitude
-    elif isinstance(branch, GeometryBranch):
-        return max(c.ampacity for c in branch.equipment.conductors).to("ampere").magnitude
-    else:
+    handler = _AMPACITY_HANDLERS.get(type(branch))
+    if handler is None:
+        handler = next(
+            (_AMPACITY_HANDLERS[cls] for cls in type(branch).__mro__ if cls in _AMPACITY_HANDLERS),
+            None,
+        )
+    if handler is None:
         msg = f"Invalid {branch=} type passed to compute ampacity."
         raise ValueError(msg)
+    return handler(branch)
 
 
 @timeit
-def add_line_edges(system: DistributionSystem, graph: nx.Graph) -> nx.Graph:
-    """Function to add line segment edges in the graph."""
+def get_line_edges(system: DistributionSystem) -> list[tuple[str, str, dict]]:
+    """Function to get line segment edges for the graph."""
 
     branches: list[DistributionBranchBase] = list(system.get_components(DistributionBranchBase))
+    edges = []
     for branch in branches:
-        edge_attrs = DistEdgeAttrs(
-            num_phase=len(branch.phases),
-            capacity_kva=(
-                _get_ampacity_from_branch(branch)
-                * branch.buses[0].nominal_voltage.to("kilovolt").magnitude
-            )
-            * (1.713 if len(branch.phases) > 1 else 1),
+        bus0, bus1 = branch.buses[0], branch.buses[1]
+        num_phase = len(branch.phases)
+        capacity_kva = _get_ampacity_from_branch(branch) * bus0.nominal_voltage.m_as(KV)
+        edge_attrs = DistEdgeAttrs.model_construct(
+            capacity_kva=float(capacity_kva * (SQRT3 if num_phase > 1 else 1)),
             edge_type=DistEdgeType.CONDUCTOR,
-            length_miles=branch.length.to("mile").magnitude,
+            length_miles=float(branch.length.m_as(MI)),
         )
-        graph.add_edge(branch.buses[0].name, branch.buses[1].name, attr=edge_attrs)
-    return graph
+        edges.append((bus0.name, bus1.name, {"attr": edge_attrs}))
+    return edges
 
 
 class PowerPair(NamedTuple):
@@ -100,20 +136,13 @@ def _get_total_load_kw_kvar(loads: list[DistributionLoad]) -> PowerPair:
     """Internal method to get total load power."""
 
     if not loads:
-        return PowerPair(active=0, reactive=0)
+        return PowerPair(active=0.0, reactive=0.0)
 
-    load_p, load_q = 0, 0
+    load_p, load_q = 0.0, 0.0
     for load in loads:
-        load_p += (
-            sum(ph_load.real_power for ph_load in load.equipment.phase_loads)
-            .to("kilowatt")
-            .magnitude
-        )
-        load_q += (
-            sum(ph_load.reactive_power for ph_load in load.equipment.phase_loads)
-            .to("kilovar")
-            .magnitude
-        )
+        for ph_load in load.equipment.phase_loads:
+            load_p += ph_load.real_power.m_as(KW)
+            load_q += ph_load.reactive_power.m_as(KVAR)
     return PowerPair(active=load_p, reactive=load_q)
 
 
@@ -121,13 +150,13 @@ def _get_total_solar_kw_kvar(solars: list[DistributionSolar]) -> PowerPair:
     """Internal method to get total solar power."""
 
     if not solars:
-        return PowerPair(active=0, reactive=0)
+        return PowerPair(active=0.0, reactive=0.0)
 
-    solar_power = 0
+    solar_power = 0.0
     for solar in solars:
-        solar_power += solar.equipment.rated_capacity.to("kilowatt").magnitude
+        solar_power += solar.equipment.rated_capacity.m_as(KW)
 
-    return PowerPair(active=solar_power, reactive=0)
+    return PowerPair(active=solar_power, reactive=0.0)
 
 
 def _get_total_capacitor_kw_kvar(
@@ -136,34 +165,20 @@ def _get_total_capacitor_kw_kvar(
     """Internal method to get total capacitor power."""
 
     if not caps:
-        return PowerPair(active=0, reactive=0)
+        return PowerPair(active=0.0, reactive=0.0)
 
-    reactive_power = 0
+    reactive_power = 0.0
     for cap in caps:
         reactive_power += sum(
-            ph_cap.rated_capacity.to("kilovar").magnitude
-            for ph_cap in cap.equipment.phase_capacitors
+            ph_cap.rated_capacity.m_as(KVAR) for ph_cap in cap.equipment.phase_capacitors
         )
-    return PowerPair(active=0, reactive=reactive_power)
-
-
-def _get_node_type(
-    load_power: PowerPair, solar_power: PowerPair, cap_power: PowerPair
-) -> NodeType:
-    """Internal function to get node type."""
-    if load_power.active > 0 and solar_power.active > 0:
-        return NodeType.LOAD_AND_GENERATION
-    elif (
-        load_power.active == 0
-        and load_power.reactive == 0
-        and solar_power.active == 0
-        and solar_power.reactive == 0
-        and cap_power.active == 0
-        and cap_power == 0
-    ):
-        return NodeType.OTHER
-    else:
-        return NodeType.LOAD
+    return PowerPair(active=0.0, reactive=reactive_power)
+
+
+@cache
+def _get_phase_type(phases: tuple[Phase, ...]) -> PhaseType:
+    """Internal function to get phase type from bus phases."""
+    return PHASE_LOOKUP["".join(sorted(el.value for el in phases))]
 
 
 def _get_bus_component_mapping(
@@ -171,48 +186,42 @@ def _get_bus_component_mapping(
 ) -> dict[str, list[Component]]:
     """Internal function to get bus component mapping."""
 
+    if "bus" not in component_type.model_fields:
+        msg = f"{component_type=} does not have `bus` field."
+        raise ValueError(msg)
+
     bus_component_mapper = defaultdict(list)
     for comp in system.get_components(component_type):
-        if not isinstance(comp, component_type):
-            msg = f"{comp=} must be an instance of {component_type}"
-            raise ValueError(msg)
-        if "bus" not in comp.model_fields:
-            msg = f"{comp=} does not have `bus` field."
-            raise ValueError()
         bus_component_mapper[comp.bus.name].append(comp)
     return bus_component_mapper
 
 
 @timeit
-def add_buses_as_nodes(system: DistributionSystem, graph: nx.Graph) -> nx.Graph:
-    """Function to add buses in the graph."""
+def get_bus_nodes(system: DistributionSystem) -> list[tuple[str, dict]]:
+    """Function to get buses as nodes for the graph."""
 
     buses: list[DistributionBus] = list(system.get_components(DistributionBus))
     solar_mapper = _get_bus_component_mapping(system, DistributionSolar)
     capacitor_mapper = _get_bus_component_mapping(system, DistributionCapacitor)
     vsource_mapper = _get_bus_component_mapping(system, DistributionVoltageSource)
     load_mapper = _get_bus_component_mapping(system, DistributionLoad)
+    nodes = []
     for bus in buses:
-        phase = "".join(sorted([el.value for el in bus.phases]))
-        load_power = _get_total_load_kw_kvar(load_mapper.get(bus.name, []))
-        solar_power = _get_total_solar_kw_kvar(solar_mapper.get(bus.name, []))
-        cap_power = _get_total_capacitor_kw_kvar(capacitor_mapper.get(bus.name, []))
-        node_attr = DistNodeAttrs(
-            num_nodes=len(bus.phases),
-            kv_level=bus.nominal_voltage.to("kilovolt").magnitude,
-            phase_type=getattr(PhaseType, phase),
+        bus_name = bus.name
+        load_power = _get_total_load_kw_kvar(load_mapper.get(bus_name, []))
+        solar_power = _get_total_solar_kw_kvar(solar_mapper.get(bus_name, []))
+        cap_power = _get_total_capacitor_kw_kvar(capacitor_mapper.get(bus_name, []))
+        node_attr = DistNodeAttrs.model_construct(
+            kv_level=float(bus.nominal_voltage.m_as(KV)),
+            phase_type=_get_phase_type(tuple(bus.phases)),
             active_demand_kw=load_power.active,
             reactive_demand_kw=load_power.reactive,
             active_generation_kw=solar_power.active,
             reactive_generation_kw=cap_power.reactive,
-            node_type=(
-                NodeType.SOURCE
-                if bus.name in vsource_mapper
-                else _get_node_type(load_power, solar_power, cap_power)
-            ),
-        )
-        graph.add_node(bus.name, attr=node_attr)
-    return graph
+            node_type=NodeType.SOURCE if bus_name in vsource_mapper else None,
+        ).recompute_node_type()
+        nodes.append((bus_name, {"attr": node_attr}))
+    return nodes
 
 
 def get_transformers_from_graph(graph: nx.Graph) -> list[tuple[str, str]]:
@@ -226,18 +235,42 @@ def get_transformers_from_graph(graph: nx.Graph) -> list[tuple[str, str]]:
     """
 
     return [
-        edge_
-        for edge_ in graph.edges
-        if graph.get_edge_data(*edge_)["attr"].edge_type == DistEdgeType.TRANSFORMER
+        (u, v)
+        for u, v, attr in graph.edges(data="attr")
+        if attr.edge_type == DistEdgeType.TRANSFORMER
     ]
 
 
+def _transformer_edge_set(graph: nx.Graph) -> frozenset[frozenset[str]]:
+    """Internal function to get orientation independent transformer edges."""
+
+    return frozenset(
+        frozenset((u, v))
+        for u, v, attr in graph.edges(data="attr")
+        if attr.edge_type == DistEdgeType.TRANSFORMER
+    )
+
+
+def _descendants_bfs(dag: nx.DiGraph, source: str) -> set[str]:
+    """Internal function to get source node and all its descendants."""
+
+    succ = dag.succ
+    seen = {source}
+    queue = deque([source])
+    while queue:
+        for child in succ[queue.popleft()]:
+            if child not in seen:
+                seen.add(child)
+                queue.append(child)
+    return seen
+
+
 def get_sub_dfs_tree(
     dfs_tree: nx.DiGraph,
     graph: nx.Graph,
     start_node: str,
-) -> nx.DiGraph:
-    """Function to return directed sub graph from a given starting node
+) -> nx.Graph:
+    """Function to return sub graph downstream of a given starting node
     with populated attributes.
 
     Args:
@@ -246,14 +279,15 @@ def get_sub_dfs_tree(
         start_node (str): Name of the starting node
 
     """
-    dfs_sub_tree = nx.dfs_tree(dfs_tree, source=start_node).to_undirected()
+    return graph.subgraph(_descendants_bfs(dfs_tree, start_node)).copy()
 
-    for node in dfs_sub_tree.nodes:
-        dfs_sub_tree.nodes[node]["attr"] = graph.nodes[node]["attr"]
-    for edge in dfs_sub_tree.edges:
-        dfs_sub_tree[edge[0]][edge[1]]["attr"] = graph.get_edge_data(*edge)["attr"]
 
-    return dfs_sub_tree
+def _find_source_node(graph: nx.Graph) -> str | None:
+    """Internal function to find the source node by scanning node attributes."""
+    return next(
+        (node for node, attr in graph.nodes(data="attr") if attr.node_type == NodeType.SOURCE),
+        None,
+    )
 
 
 def get_source_dfs(graph: nx.Graph) -> nx.DiGraph:
@@ -265,12 +299,54 @@ def get_source_dfs(graph: nx.Graph) -> nx.DiGraph:
 
     Returns:
         nx.DiGraph: Instance of directed graph
+
+    Raises:
+        ValueError: If graph has no source node.
     """
 
-    source_node = [
-        node for node in graph.nodes if graph.nodes[node]["attr"].node_type == NodeType.SOURCE
-    ]
-    return nx.dfs_tree(graph, source=source_node[0])
+    source_node = graph.graph.get("source")
+    if source_node not in graph or graph.nodes[source_node]["attr"].node_type != NodeType.SOURCE:
+        source_node = _find_source_node(graph)
+    if source_node is None:
+        msg = "This graph has no source node."
+        raise ValueError(msg)
+    return nx.dfs_tree(graph, source=source_node)
+
+
+def get_transformer_counts(dfs_tree: nx.DiGraph, graph: nx.Graph) -> dict[str, int]:
+    """Function to return number of transformers below each node.
+
+    Counts are accumulated bottom-up in a single post-order pass over
+    the directed tree, so every node is visited only once.
+
+    Args:
+        dfs_tree (nx.DiGraph): Directed tree rooted at source node.
+        graph (nx.Graph): Original graph with attributes
+
+    Return:
+        dict[str, int]: Mapping between node and number of transformers
+            in the sub tree starting from that node.
+    """
+
+    trans_count = {}
+    for node in nx.dfs_postorder_nodes(dfs_tree):
+        trans_count[node] = sum(
+            trans_count[child] + (graph[node][child]["attr"].edge_type == DistEdgeType.TRANSFORMER)
+            for child in dfs_tree.successors(node)
+        )
+    return trans_count
+
+
+def _set_source_node(graph: nx.Graph, node: str) -> None:
+    """Internal function to mark node as source in a sub graph.
+
+    Attributes are shared with the parent graph, so node attribute
+    is copied before updating to keep the parent graph untouched.
+    """
+    graph.nodes[node]["attr"] = graph.nodes[node]["attr"].model_copy(
+        update={"node_type": NodeType.SOURCE}
+    )
+    graph.graph["source"] = node
 
 
 def get_node_graphs(graph: nx.Graph, lt: int, gt: int) -> list[nx.Graph]:
@@ -288,21 +364,25 @@ def get_node_graphs(graph: nx.Graph, lt: int, gt: int) -> list[nx.Graph]:
 
     sub_graphs = []
     dfs_tree = get_source_dfs(graph)
+    trans_count = get_transformer_counts(dfs_tree, graph)
+    tr_set = _transformer_edge_set(graph)
 
     transformer_nodes_set = set()
 
     for node in graph.nodes:
+        if not lt <= trans_count[node] <= gt:
+            continue
         dfs_sub_graph = get_sub_dfs_tree(
             dfs_tree=dfs_tree,
             graph=graph,
             start_node=node,
         )
-        trs = set(get_transformers_from_graph(dfs_sub_graph))
+        trs = {frozenset(edge_) for edge_ in dfs_sub_graph.edges} & tr_set
 
-        if lt <= len(trs) <= gt and not (transformer_nodes_set & trs):
+        if not (transformer_nodes_set & trs):
             transformer_nodes_set.update(trs)
-            dfs_sub_graph.nodes[node]["attr"].node_type = NodeType.SOURCE
-            sub_graphs.append(copy.deepcopy(dfs_sub_graph))
+            _set_source_node(dfs_sub_graph, node)
+            sub_graphs.append(dfs_sub_graph)
 
     return sub_graphs
 
@@ -310,30 +390,25 @@ def get_node_graphs(graph: nx.Graph, lt: int, gt: int) -> list[nx.Graph]:
 def get_transformer_sub_graphs(graph: nx.Graph) -> list[nx.Graph]:
     """Method to get subgraphs for each distribution transformers."""
     sub_graphs = []
-    tr_edges = get_transformers_from_graph(graph)
     dfs_tree = get_source_dfs(graph)
+    trans_count = get_transformer_counts(dfs_tree, graph)
 
-    tr_node = None
-    for tr_edge in tr_edges:
-        for tr_node in tr_edge:
+    for tr_edge in get_transformers_from_graph(graph):
+        tr_node = next((node for node in tr_edge if trans_count[node] > 0), tr_edge[-1])
+        if trans_count[tr_node] == 1:
             dfs_sub_graph = get_sub_dfs_tree(
                 dfs_tree=dfs_tree,
                 graph=graph,
                 start_node=tr_node,
             )
-            num_trans = len(get_transformers_from_graph(dfs_sub_graph))
-            if num_trans > 0:
-                break
-
-        if num_trans == 1:
-            dfs_sub_graph.nodes[tr_node]["attr"].node_type = NodeType.SOURCE
-            sub_graphs.append(copy.deepcopy(dfs_sub_graph))
+            _set_source_node(dfs_sub_graph, tr_node)
+            sub_graphs.append(dfs_sub_graph)
 
     return sub_graphs
 
 
 @timeit
-def get_networkx_model(sys: DistributionSystem) -> nx.Graph:
+def get_networkx_model(sys: DistributionSystem, check_cycles: bool = True) -> nx.Graph:
     """Extract the opendss models and returns networkx
     representation of the model.
 
@@ -342,6 +417,9 @@ def get_networkx_model(sys: DistributionSystem) -> nx.Graph:
 
     sys : DistributionSystem
         Instance of the DistributionSystem
+    check_cycles : bool
+        Raise error if the network has loops. Callers validating
+        extracted sub graphs instead can skip this check.
 
     Returns:
        nx.Graph: Networkx undirected graph instance.
@@ -349,23 +427,22 @@ def get_networkx_model(sys: DistributionSystem) -> nx.Graph:
     """
 
     graph = nx.Graph()
+    graph.add_nodes_from(get_bus_nodes(sys))
+    graph.add_edges_from(chain(get_line_edges(sys), get_transformer_edges(sys)))
 
-    graph = add_buses_as_nodes(sys, graph)
-    graph = add_line_edges(sys, graph)
-    graph = add_transformer_edges(sys, graph)
-
-    for node in graph.nodes:
-        node_attr: DistNodeAttrs = graph.nodes[node]["attr"]
-        node_attr_dict = node_attr.model_dump()
-        graph.nodes[node]["attr"] = DistNodeAttrs(**node_attr_dict)
-
-    components = list(nx.connected_components(graph))
-    if len(components) > 1:
-        graph = graph.subgraph(max(components, key=len))
+    largest_component = max(nx.connected_components(graph), key=len, default=set())
+    if len(largest_component) < graph.number_of_nodes():
+        graph = graph.subgraph(largest_component).copy()
 
-    loops = list(nx.simple_cycles(graph))
-    if loops:
-        msg = f"This network has {loops=}"
+    # Connected graph is loop free only if it has one edge less than nodes.
+    if (
+        check_cycles
+        and graph.number_of_nodes()
+        and graph.number_of_edges() >= graph.number_of_nodes()
+    ):
+        loop = nx.find_cycle(graph)
+        msg = f"This network has {loop=}"
         raise ValueError(msg)
 
+    graph.graph["source"] = _find_source_node(graph)
     return graph
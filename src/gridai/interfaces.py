@@ -1,12 +1,17 @@
 """This module contains data model for node and edge
 attributes.
+
+Models built by `gridai.gdm_mapper` use `model_construct` and skip
+validation, since their values come from already validated gdm
+components. Validation runs when reading arrays back with `from_array`.
 """
 
 from enum import Enum
+from functools import cache
 from typing import Any, Optional, Self
 from typing_extensions import Annotated
 
-from pydantic import BaseModel, model_validator, PlainSerializer, Field
+from pydantic import BaseModel, ConfigDict, PlainSerializer, Field, model_validator
 
 
 class NodeType(str, Enum):
@@ -34,6 +39,9 @@ NODE_TYPE_MAPPING = {
     (False, False): NodeType.OTHER,
 }
 
+# NODE_TYPE_MAPPING indexed by (has_generation << 1) | has_demand
+_NODE_TYPE_TABLE = tuple(NODE_TYPE_MAPPING[(bool(key >> 1), bool(key & 1))] for key in range(4))
+
 
 class DistEdgeType(str, Enum):
     """Interface for dist edge type."""
@@ -56,14 +64,10 @@ class PhaseType(str, Enum):
     AN = "AN"
     BN = "BN"
     CN = "CN"
-    BA = "AB"
-    CB = "BC"
-    AC = "CA"
     S1 = "S1"
     S2 = "S2"
     S1S2 = "S1S2"
     NS1S2 = "S1S2N"
-    S2S1 = "S1S2"
     S1N = "S1N"
     S2N = "S2N"
 
@@ -74,12 +78,26 @@ serializer = PlainSerializer(lambda x: x.value, when_used="always")
 class GraphBaseModel(BaseModel):
     """Base interface for node and edges."""
 
+    model_config = ConfigDict(extra="forbid", validate_assignment=False)
+
+    @classmethod
+    @cache
+    def _attr_plan(cls) -> tuple[tuple[str, bool], ...]:
+        """Returns field names in order along with a flag for enum fields."""
+        return tuple(
+            (name, isinstance(info.annotation, type) and issubclass(info.annotation, Enum))
+            for name, info in cls.model_fields.items()
+        )
+
     def to_array(self):
-        return list(self.model_dump().values())
+        return [
+            getattr(self, name).value if is_enum else getattr(self, name)
+            for name, is_enum in self._attr_plan()
+        ]
 
     @classmethod
     def from_array(cls, values: list[Any]) -> Self:
-        return cls.model_validate(dict(zip(cls.model_fields.keys(), values)))
+        return cls.model_validate(dict(zip((name for name, _ in cls._attr_plan()), values)))
 
 
 class DistNodeAttrs(GraphBaseModel):
@@ -111,16 +129,22 @@ class DistNodeAttrs(GraphBaseModel):
     phase_type: Annotated[PhaseType, serializer]
     kv_level: Annotated[float, Field(ge=0, le=700)]
 
+    def recompute_node_type(self) -> "DistNodeAttrs":
+        """Recompute node type from generation and demand unless node is source.
+
+        Call this once after all power values are set.
+        """
+        if self.node_type != NodeType.SOURCE:
+            self.node_type = _NODE_TYPE_TABLE[
+                (bool(self.active_generation_kw) << 1) | bool(self.active_demand_kw)
+            ]
+        return self
+
     @model_validator(mode="after")
     def compute_node_type(self) -> "DistNodeAttrs":
         """Compute node type if not passed."""
-        if self.node_type != NodeType.SOURCE:
-            self.node_type = NODE_TYPE_MAPPING[
-                (
-                    bool(self.active_generation_kw),
-                    bool(self.active_demand_kw),
-                )
-            ]
+        if self.node_type is None:
+            self.recompute_node_type()
         return self
 
 
@@ -1,11 +1,14 @@
 """Test module for testing utility in smartds module."""
 
+import os
 from pathlib import Path
+import shutil
 
 from gridai.interfaces import DistNodeAttrs
+import pytest
 from torch_geometric.data import SQLiteDatabase
 
-from gridai.create_dataset import create_dataset
+from gridai.create_dataset import _iter_json_files, create_dataset
 
 
 def test_creating_dataset(tmp_path):
@@ -23,3 +26,77 @@ def test_creating_dataset(tmp_path):
     assert len(db)
     _ = DistNodeAttrs.from_array(db[0].x[0])
     db.close()
+
+
+def test_creating_dataset_without_sub_graphs(tmp_path):
+    """Test creating dataset when no sub graph meets the transformer limits."""
+
+    sqlite_file, table_name = tmp_path / "dataset.sqlite", "data_table"
+    create_dataset(
+        Path(__file__).parent / "data" / "p10_gdm.json",
+        sqlite_file=sqlite_file,
+        table_name=table_name,
+        dist_xmfr_graphs=False,
+        min_num_transformers=5000,
+        max_num_transformers=6000,
+    )
+    db = SQLiteDatabase(path=sqlite_file, name=table_name)
+    assert len(db) == 0
+    db.close()
+
+
+def test_creating_dataset_from_folder(tmp_path):
+    """Test creating dataset from a folder with and without multiple processes."""
+
+    data_folder = Path(__file__).parent / "data"
+    systems_folder = tmp_path / "systems"
+    for sub_folder in ["system_1", "group/system_2"]:
+        shutil.copytree(data_folder, systems_folder / sub_folder)
+
+    rows = []
+    for max_workers in [1, 2]:
+        sqlite_file, table_name = tmp_path / f"dataset_{max_workers}.sqlite", "data_table"
+        create_dataset(
+            systems_folder,
+            sqlite_file=sqlite_file,
+            table_name=table_name,
+            max_workers=max_workers,
+        )
+        db = SQLiteDatabase(path=sqlite_file, name=table_name)
+        rows.append([db[i].x for i in range(len(db))])
+        db.close()
+
+    assert rows[0]
+    assert rows[0] == rows[1]
+
+
+def test_iter_json_files_skips_unreadable_folders(tmp_path, monkeypatch):
+    """Test json files are found in nested folders and unreadable folders are skipped."""
+
+    for sub_folder in ["a", "b/c", "locked/d"]:
+        (tmp_path / sub_folder).mkdir(parents=True)
+        (tmp_path / sub_folder / "system.json").touch()
+
+    scandir = os.scandir
+
+    def mock_scandir(path):
+        if Path(path).name == "locked":
+            raise PermissionError(path)
+        return scandir(path)
+
+    monkeypatch.setattr(os, "scandir", mock_scandir)
+    assert sorted(_iter_json_files(tmp_path)) == [
+        tmp_path / "a" / "system.json",
+        tmp_path / "b" / "c" / "system.json",
+    ]
+
+
+def test_creating_dataset_with_invalid_workers(tmp_path):
+    """Test creating dataset fails for invalid number of workers."""
+
+    with pytest.raises(ValueError, match="max_workers"):
+        create_dataset(
+            Path(__file__).parent / "data" / "p10_gdm.json",
+            sqlite_file=tmp_path / "dataset.sqlite",
+            max_workers=0,
+        )
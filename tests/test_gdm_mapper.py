@@ -3,14 +3,108 @@
 from pathlib import Path
 
 import networkx as nx
-from gdm import DistributionSystem
+import pytest
+from gdm import DistributionSystem, DistributionTransformer
+from gdm.quantities import PositiveApparentPower, PositiveVoltage
 
-from gridai.gdm_mapper import get_networkx_model
+from gridai.gdm_mapper import (
+    get_networkx_model,
+    get_node_graphs,
+    get_source_dfs,
+    get_transformer_sub_graphs,
+    get_transformers_from_graph,
+)
+from gridai.interfaces import NodeType
 
 
-def test_generating_networkx_graph():
+@pytest.fixture(scope="module")
+def system() -> DistributionSystem:
+    """Fixture loading the test distribution system once per module."""
+    return DistributionSystem.from_json(Path(__file__).parent / "data" / "p10_gdm.json")
+
+
+def test_generating_networkx_graph(system):
     """Test function to generate networkx representation from system json fule"""
 
-    json_file = Path(__file__).parent / "data" / "p10_gdm.json"
-    graph = get_networkx_model(DistributionSystem.from_json(json_file))
+    graph = get_networkx_model(system)
     assert isinstance(graph, nx.Graph)
+
+
+def test_transformer_sub_graphs(system):
+    """Test function to extract one sub graph per distribution transformer."""
+
+    graph = get_networkx_model(system)
+    sub_graphs = get_transformer_sub_graphs(graph)
+    assert sub_graphs
+    for sub_graph in sub_graphs:
+        assert len(get_transformers_from_graph(sub_graph)) == 1
+        source_nodes = [
+            node
+            for node, attr in sub_graph.nodes(data="attr")
+            if attr.node_type == NodeType.SOURCE
+        ]
+        assert len(source_nodes) == 1
+        assert sub_graph.graph["source"] == source_nodes[0]
+        assert graph.nodes[source_nodes[0]]["attr"].node_type != NodeType.SOURCE
+
+
+def test_node_graphs(system):
+    """Test function to extract node sub graphs with limit on number of transformers."""
+
+    graph = get_networkx_model(system)
+    sub_graphs = get_node_graphs(graph, lt=3, gt=10)
+    assert sub_graphs
+    seen_transformers = set()
+    for sub_graph in sub_graphs:
+        transformers = {frozenset(edge) for edge in get_transformers_from_graph(sub_graph)}
+        assert 3 <= len(transformers) <= 10
+        assert not seen_transformers & transformers
+        seen_transformers.update(transformers)
+
+
+def test_graph_attrs_are_float(system, monkeypatch):
+    """Test numeric node and edge attributes are stored as floats."""
+
+    # Use int valued quantities to check values are converted to float.
+    transformer = next(system.get_components(DistributionTransformer))
+    bus = transformer.buses[1]
+    monkeypatch.setattr(
+        transformer.equipment.windings[0], "rated_power", PositiveApparentPower(25, "kilova")
+    )
+    monkeypatch.setattr(bus, "nominal_voltage", PositiveVoltage(7, "kilovolt"))
+
+    graph = get_networkx_model(system)
+    assert graph.edges[transformer.buses[0].name, bus.name]["attr"].to_array()[0] == 25.0
+    assert graph.nodes[bus.name]["attr"].kv_level == 7.0
+    for _, attr in graph.nodes(data="attr"):
+        values = attr.to_array()
+        assert all(isinstance(value, float) for value in values[1:5] + values[6:])
+    for _, _, attr in graph.edges(data="attr"):
+        assert isinstance(attr.capacity_kva, float)
+        assert isinstance(attr.length_miles, float)
+
+
+def test_source_dfs_without_source_node(system):
+    """Test directed graph creation fails for graph without source node."""
+
+    graph = get_networkx_model(system)
+    sub_graph = graph.subgraph(node for node in graph.nodes if node != graph.graph["source"])
+    with pytest.raises(ValueError, match="no source node"):
+        get_source_dfs(sub_graph)
+
+    graph.remove_node(graph.graph["source"])
+    with pytest.raises(ValueError, match="no source node"):
+        get_source_dfs(graph)
+
+
+def test_source_dfs_with_moved_source_node(system):
+    """Test directed graph uses the current source node instead of cached one."""
+
+    graph = get_networkx_model(system)
+    old_source = graph.graph["source"]
+    new_source = next(node for node in graph.nodes if node != old_source)
+    graph.nodes[old_source]["attr"].node_type = NodeType.OTHER
+    graph.nodes[new_source]["attr"].node_type = NodeType.SOURCE
+    dfs_tree = get_source_dfs(graph)
+    assert dfs_tree.in_degree(new_source) == 0
+    assert dfs_tree.in_degree(old_source) == 1
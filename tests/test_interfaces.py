@@ -0,0 +1,42 @@
+"""Test module for node and edge data interfaces."""
+
+from gridai.interfaces import (
+    DistEdgeAttrs,
+    DistEdgeType,
+    DistNodeAttrs,
+    NodeType,
+    PhaseType,
+)
+
+
+def test_attrs_array_round_trip():
+    """Test converting node and edge attributes to array and back."""
+
+    node_attr = DistNodeAttrs(
+        node_type=NodeType.SOURCE,
+        active_demand_kw=10.0,
+        phase_type=PhaseType.ABC,
+        kv_level=7.2,
+    )
+    node_array = node_attr.to_array()
+    assert node_array == ["SOURCE", 10.0, 0.0, 0.0, 0.0, "ABC", 7.2]
+    assert DistNodeAttrs.from_array(node_array) == node_attr
+
+    edge_attr = DistEdgeAttrs(
+        capacity_kva=25.0, edge_type=DistEdgeType.TRANSFORMER, length_miles=0.0
+    )
+    edge_array = edge_attr.to_array()
+    assert edge_array == [25.0, "TRANSFORMER", 0.0]
+    assert DistEdgeAttrs.from_array(edge_array) == edge_attr
+
+
+def test_node_type_computed_if_missing():
+    """Test node type is derived from power values when not passed."""
+
+    node_attr = DistNodeAttrs(active_demand_kw=5.0, phase_type=PhaseType.A, kv_level=1.0)
+    assert node_attr.node_type == NodeType.LOAD
+    assert node_attr.to_array()[0] == "LOAD"
+    assert node_attr.model_dump()["node_type"] == "LOAD"
+
+    node_attr = DistNodeAttrs(phase_type=PhaseType.A, kv_level=1.0)
+    assert node_attr.node_type == NodeType.OTHER